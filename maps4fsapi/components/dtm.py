@@ -9,6 +9,7 @@ from maps4fsapi.components.models import (
     LatLonPayload,
 )
 from maps4fsapi.limits import DEFAULT_PUBLIC_LIMIT, dependencies, public_limiter
+from maps4fsapi.payloads import validate_payload
 from maps4fsapi.tasks import TasksQueue, get_session_name_from_payload, task_generation
 
 dtm_router = APIRouter(dependencies=dependencies)
@@ -61,16 +62,25 @@ def dtm_dem(payload: DEMSettingsPayload, request: Request) -> dict[str, str | bo
     Returns:
         dict: A dictionary containing the success status, description, and task ID.
     """
+    try:
+        validate_payload(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     task_id = get_session_name_from_payload(payload)
 
-    TasksQueue().add_task(
+    if not TasksQueue().add_task(
         task_id,
         task_generation,
         # task_id,
         payload,
         ["Background"],
         ["dem"],
-    )
+    ):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Task {task_id} is already queued or being processed.",
+        )
 
     return {
         "success": True,
@@ -1,9 +1,10 @@
 """Generate GRLE data for the given payload."""
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
 
 from maps4fsapi.components.models import I3DSettingsPayload
 from maps4fsapi.limits import DEFAULT_PUBLIC_LIMIT, dependencies, public_limiter
+from maps4fsapi.payloads import validate_payload
 from maps4fsapi.tasks import TasksQueue, get_session_name_from_payload, task_generation
 
 i3d_router = APIRouter(dependencies=dependencies)
@@ -27,6 +28,11 @@ def i3d_generation(
     """
     endpoint = request.url.path
 
+    try:
+        validate_payload(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     task_id = get_session_name_from_payload(payload)
 
     if endpoint.endswith("/forests"):
@@ -37,14 +43,18 @@ def i3d_generation(
     else:
         assets = ["splines"]
 
-    TasksQueue().add_task(
+    if not TasksQueue().add_task(
         task_id,
         task_generation,
         # task_id,
         payload,
         ["Background", "Texture", "I3d"],
         assets,
-    )
+    ):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Task {task_id} is already queued or being processed.",
+        )
 
     return {
         "success": True,
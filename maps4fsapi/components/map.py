@@ -9,6 +9,7 @@ from maps4fs.generator.constants import Paths
 from maps4fsapi.components.models import MapGenerationPayload
 from maps4fsapi.config import PUBLIC_QUEUE_LIMIT, is_public
 from maps4fsapi.limits import HIGH_DEMAND_PUBLIC_LIMIT, dependencies, public_limiter
+from maps4fsapi.payloads import validate_payload
 from maps4fsapi.tasks import TasksQueue, get_session_name_from_payload, task_generation
 
 map_router = APIRouter()
@@ -40,9 +41,14 @@ def map_generation(
                 detail="The server is currently experiencing high demand. Please try again later.",
             )
 
+    try:
+        validate_payload(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     task_id = get_session_name_from_payload(payload)
 
-    TasksQueue().add_task(
+    if not TasksQueue().add_task(
         task_id,
         task_generation,
         # task_id,
@@ -51,7 +57,11 @@ def map_generation(
         None,
         include_all=True,
         origin=origin,
-    )
+    ):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Task {task_id} is already queued or being processed.",
+        )
 
     return {
         "success": True,
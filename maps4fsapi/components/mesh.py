@@ -1,9 +1,10 @@
 """Generate mesh data for the given payload."""
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
 
 from maps4fsapi.components.models import BackgroundSettingsPayload
 from maps4fsapi.limits import DEFAULT_PUBLIC_LIMIT, dependencies, public_limiter
+from maps4fsapi.payloads import validate_payload
 from maps4fsapi.tasks import TasksQueue, get_session_name_from_payload, task_generation
 
 mesh_router = APIRouter(dependencies=dependencies)
@@ -26,6 +27,11 @@ def mesh_generation(
     """
     endpoint = request.url.path
 
+    try:
+        validate_payload(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     task_id = get_session_name_from_payload(payload)
 
     if endpoint.endswith("/water"):
@@ -38,14 +44,18 @@ def mesh_generation(
     payload.background_settings.generate_background = not generate_water
     payload.background_settings.generate_water = generate_water
 
-    TasksQueue().add_task(
+    if not TasksQueue().add_task(
         task_id,
         task_generation,
         # task_id,
         payload,
         ["Background"],
         assets,
-    )
+    ):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Task {task_id} is already queued or being processed.",
+        )
 
     return {
         "success": True,
@@ -1,5 +1,6 @@
 """Maps4FS API Models used to validate and structure data for various endpoints."""
 
+import functools
 from typing import Any, Literal
 
 import maps4fs as mfs
@@ -65,6 +66,17 @@ class MainSettingsPayload(GameCodePayload):
     custom_map_template_path: str | None = None
     custom_buildings_schema_path: str | None = None
 
+    @classmethod
+    @functools.cache
+    def settings_fields(cls) -> tuple[str, ...]:
+        """Get the names of the fields which hold settings, e.g. "dem_settings".
+        The fields are fixed per payload class, so the names are computed once per class.
+
+        Returns:
+            tuple[str, ...]: The names of the settings fields.
+        """
+        return tuple(name for name in cls.model_fields.keys() if name.endswith("_settings"))
+
 
 class DEMSettingsPayload(MainSettingsPayload):
     """Payload model for DEM settings, extending MainSettingsPayload."""
@@ -1,9 +1,10 @@
 """Generate GRLE data for the given payload."""
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
 
 from maps4fsapi.components.models import SatelliteSettingsPayload
 from maps4fsapi.limits import DEFAULT_PUBLIC_LIMIT, dependencies, public_limiter
+from maps4fsapi.payloads import validate_payload
 from maps4fsapi.tasks import TasksQueue, get_session_name_from_payload, task_generation
 
 satellite_router = APIRouter(dependencies=dependencies)
@@ -26,6 +27,11 @@ def satellite_generation(
     """
     endpoint = request.url.path
 
+    try:
+        validate_payload(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     task_id = get_session_name_from_payload(payload)
 
     payload.satellite_settings.download_images = True
@@ -35,14 +41,18 @@ def satellite_generation(
     else:
         assets = ["background"]
 
-    TasksQueue().add_task(
+    if not TasksQueue().add_task(
         task_id,
         task_generation,
         # task_id,
         payload,
         ["Satellite"],
         assets,
-    )
+    ):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Task {task_id} is already queued or being processed.",
+        )
 
     return {
         "success": True,
@@ -1,9 +1,10 @@
 """Generate GRLE data for the given payload."""
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
 
 from maps4fsapi.components.models import TextureSettingsPayload
 from maps4fsapi.limits import DEFAULT_PUBLIC_LIMIT, dependencies, public_limiter
+from maps4fsapi.payloads import validate_payload
 from maps4fsapi.tasks import TasksQueue, get_session_name_from_payload, task_generation
 
 texture_router = APIRouter(dependencies=dependencies)
@@ -23,20 +24,29 @@ def texture_generation(
     Returns:
         dict: A dictionary containing the success status, description, and task ID.
     """
+    try:
+        validate_payload(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     task_id = get_session_name_from_payload(payload)
 
     assets = None
     if payload.layer_names:
         assets = payload.layer_names
 
-    TasksQueue().add_task(
+    if not TasksQueue().add_task(
         task_id,
         task_generation,
         # task_id,
         payload,
         ["Texture"],
         assets,
-    )
+    ):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Task {task_id} is already queued or being processed.",
+        )
 
     return {
         "success": True,
@@ -2,6 +2,7 @@
 
 import os
 import subprocess
+import threading
 from time import time
 from typing import Any
 
@@ -35,6 +36,19 @@ PUBLIC_HOSTNAME_KEY = "PUBLIC_HOSTNAME"
 PUBLIC_HOSTNAME_VALUE = "maps4fs"
 
 PUBLIC_QUEUE_LIMIT = 10
+# Number of tasks processed in parallel, all workers take tasks from the same FIFO queue.
+# Set to "auto" to run one worker per CPU core.
+MAX_PARALLEL_TASKS_ENV = os.getenv("MAX_PARALLEL_TASKS", "1")
+if MAX_PARALLEL_TASKS_ENV.strip().lower() == "auto":
+    MAX_PARALLEL_TASKS = os.cpu_count() or 1
+else:
+    MAX_PARALLEL_TASKS = max(1, int(MAX_PARALLEL_TASKS_ENV))
+# Maximum number of tasks waiting in the queue, new tasks are rejected while it's full,
+# so a burst of requests can't hold an unbounded number of payloads in memory.
+MAX_QUEUE_SIZE = max(1, int(os.getenv("MAX_QUEUE_SIZE", "64")))
+# Number of threads handling the file I/O of the tasks (custom OSM data, schemas),
+# separate from the task workers, so the I/O does not take a task slot.
+MAX_IO_WORKERS = max(1, int(os.getenv("MAX_IO_WORKERS", "4")))
 
 USERPROFILE = os.getenv("USERPROFILE")
 if not USERPROFILE:
@@ -227,11 +241,21 @@ logger.info("Maps4FS package version: %s", package_version)
 
 
 class Singleton(type):
-    """A metaclass for creating singleton classes."""
+    """A metaclass for creating singleton classes.
+    The lock is only taken while the instance does not exist yet, so concurrent first calls
+    create a single instance and later calls are a plain dictionary lookup.
+    """
 
     _instances: dict[Any, Any] = {}
+    # Reentrant, so a singleton can create another one in its constructor.
+    _lock = threading.RLock()
 
     def __call__(cls, *args, **kwargs):
-        if cls not in cls._instances:
-            cls._instances[cls] = super().__call__(*args, **kwargs)
-        return cls._instances[cls]
+        instance = cls._instances.get(cls)
+        if instance is None:
+            with cls._lock:
+                instance = cls._instances.get(cls)
+                if instance is None:
+                    instance = super().__call__(*args, **kwargs)
+                    cls._instances[cls] = instance
+        return instance
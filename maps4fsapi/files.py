@@ -0,0 +1,99 @@
+"""Writing of the task files: output archives and custom OSM data."""
+
+import os
+import stat
+import zipfile
+from time import localtime
+
+from maps4fsapi.config import logger
+
+# Deflate level of the files in archives, 1 is the fastest.
+ARCHIVE_COMPRESSLEVEL = 1
+# Files smaller than this (in bytes) are read into memory and written into archives at once.
+ARCHIVE_IN_MEMORY_SIZE = 1 << 20  # 1 MiB.
+# Extensions of already compressed files, which are stored in archives without compression.
+ARCHIVE_STORED_EXTENSIONS = frozenset({".zip", ".png", ".jpg", ".jpeg", ".dds", ".gz"})
+# Number of characters of the custom OSM data encoded and written to disk at once.
+OSM_WRITE_CHUNK_SIZE = 1 << 20
+
+
+def files_to_archive(filepaths: list[str], archive_path: str) -> None:
+    """Creates a zip archive containing the specified files.
+    Files are compressed with the fastest deflate level: the outputs are mostly binary data,
+    for which higher levels cost a lot of CPU time for a negligible size reduction.
+    Already compressed files (nested zip archives, images) are stored as they are,
+    compressing them again costs CPU time and gains nothing.
+
+    Arguments:
+        filepaths (list[str]): List of file paths to include in the archive.
+        archive_path (str): Path where the zip archive will be created.
+    """
+    with zipfile.ZipFile(
+        archive_path,
+        "w",
+        compression=zipfile.ZIP_DEFLATED,
+        compresslevel=ARCHIVE_COMPRESSLEVEL,
+        allowZip64=True,
+    ) as archive:
+        for filepath in filepaths:
+            # A single stat call tells whether the file exists and provides its entry metadata.
+            try:
+                file_stat = os.stat(filepath)
+            except OSError:
+                continue
+            if not stat.S_ISREG(file_stat.st_mode):
+                continue
+            compress_type = archive.compression
+            if os.path.splitext(filepath)[1].lower() in ARCHIVE_STORED_EXTENSIONS:
+                compress_type = zipfile.ZIP_STORED
+            zip_info = zipfile.ZipInfo(
+                os.path.basename(filepath), localtime(file_stat.st_mtime)[:6]
+            )
+            zip_info.external_attr = (file_stat.st_mode & 0xFFFF) << 16
+            zip_info.file_size = file_stat.st_size
+            if zip_info.file_size < ARCHIVE_IN_MEMORY_SIZE:
+                # Small files are read at once and compressed in a single call.
+                with open(filepath, "rb") as f:
+                    data = f.read()
+                archive.writestr(
+                    zip_info,
+                    data,
+                    compress_type=compress_type,
+                    compresslevel=archive.compresslevel,
+                )
+            else:
+                archive.write(filepath, arcname=zip_info.filename, compress_type=compress_type)
+
+
+def osm_str_to_xml(custom_osm_str: str, save_path: str) -> None:
+    """Converts an OSM stringified data to XML format and saves it to a file.
+    The string is encoded and written in chunks straight to the file descriptor, so a full
+    encoded copy of a large OSM payload is never held in memory and no buffer copies are made.
+    The data is written to a temporary file first and then renamed, so a partially written
+    file is never visible under the save path.
+
+    Arguments:
+        custom_osm_str (str): The OSM XML string to save.
+        save_path (str): The path to save the XML file.
+    """
+    try:
+        tmp_path = f"{save_path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            for start in range(0, len(custom_osm_str), OSM_WRITE_CHUNK_SIZE):
+                chunk = custom_osm_str[start : start + OSM_WRITE_CHUNK_SIZE]
+                data = memoryview(chunk.encode("utf-8"))
+                while data:
+                    data = data[os.write(fd, data) :]
+        except BaseException:
+            os.close(fd)
+            os.remove(tmp_path)
+            raise
+        os.close(fd)
+        os.replace(tmp_path, save_path)
+
+        logger.debug("Successfully saved OSM XML to: %s", save_path)
+
+    except Exception as e:
+        logger.error("Failed to save OSM XML to file: %s", e)
+        raise ValueError(f"Error saving OSM data: {e}")
@@ -28,7 +28,7 @@ from maps4fsapi.config import (
     package_version,
     version_status,
 )
-from maps4fsapi.tasks import TasksQueue
+from maps4fsapi.tasks import QueueFullError, TasksQueue
 
 # Configure logging to suppress INFO level access logs
 logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
@@ -95,6 +95,21 @@ async def log_requests(request: Request, call_next: Callable) -> Response:
     return response
 
 
+@app.exception_handler(QueueFullError)
+async def queue_full_handler(request: Request, exc: QueueFullError) -> JSONResponse:
+    """Responds with 503 if a task can't be added because the queue is full.
+
+    Arguments:
+        request (Request): The request which tried to add the task.
+        exc (QueueFullError): The raised exception.
+
+    Returns:
+        JSONResponse: A JSON response with the error details.
+    """
+    logger.warning("Rejected request to %s: %s", request.url.path, exc)
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
 if is_public:
     app.add_middleware(
         CORSMiddleware,
@@ -171,6 +186,7 @@ async def health_check() -> JSONResponse:
         "failed_percentage": failed_percentage,
         "average_processing_time": TasksQueue().average_processing_time(),
         "estimated_wait_time": TasksQueue().wait_in_queue(),
+        "recent_stats": TasksQueue().stats(),
     }
     return JSONResponse(
         content=content,
@@ -0,0 +1,241 @@
+"""Validation of the task payloads, run before the tasks are queued and by the workers."""
+
+import functools
+import os
+from typing import Any, Literal, NamedTuple
+
+import maps4fs as mfs
+from maps4fs.generator.constants import Paths
+
+from maps4fsapi.components.models import MainSettingsPayload
+from maps4fsapi.config import PUBLIC_MAX_MAP_SIZE, is_public, logger
+from maps4fsapi.validation import (
+    SecurityValidationError,
+    safe_path_join,
+    sanitize_dict_values,
+    validate_filename,
+    validate_path_exists,
+)
+
+# Types of the custom schemas and the payload fields with their file names.
+CUSTOM_SCHEMA_FIELDS: tuple[tuple[Literal["texture", "tree", "buildings"], str], ...] = (
+    ("texture", "custom_texture_schema_path"),
+    ("tree", "custom_tree_schema_path"),
+    ("buildings", "custom_buildings_schema_path"),
+)
+# Directories of the custom schemas by their type, inside the game templates directory.
+SCHEMA_DIRS = {
+    "texture": "texture_schemas",
+    "tree": "tree_schemas",
+    "buildings": "buildings_schemas",
+}
+
+
+class ValidatedPayload(NamedTuple):
+    """Settings of a task resolved from its payload by validate_payload."""
+
+    dtm_provider: Any  # The DTM provider class.
+    dtm_provider_settings: Any  # Validated settings of the DTM provider, if it requires them.
+    custom_osm_path: str | None  # Resolved path of the custom OSM file from the defaults.
+    custom_background_path: str | None  # Resolved path of the custom DEM file.
+    custom_template_path: str | None  # Resolved path of the custom map template.
+
+
+def validate_payload(payload: MainSettingsPayload) -> ValidatedPayload:
+    """Runs the fast checks of the payload which don't require the map generation: payload
+    type, public size limits, DTM provider and its settings, user-provided file and schema
+    paths. Called by the endpoints before the task is queued, so invalid requests are rejected
+    immediately instead of taking a worker slot, and again by the worker, since the files may
+    change while the task waits.
+
+    Arguments:
+        payload (MainSettingsPayload): The settings payload of the task.
+
+    Raises:
+        TypeError: If the payload is not an instance of MainSettingsPayload.
+        ValueError: If the payload is invalid.
+
+    Returns:
+        ValidatedPayload: The resolved DTM provider, its settings and the file paths.
+    """
+    if not isinstance(payload, MainSettingsPayload):
+        raise TypeError("Payload must be an instance of MainSettingsPayload")
+
+    if is_public:
+        for size_name, size in (("Map size", payload.size), ("Output size", payload.output_size)):
+            if size is not None and size > PUBLIC_MAX_MAP_SIZE:
+                logger.warning(
+                    "%s %s is larger than %s, will stop generation to prevent issues.",
+                    size_name,
+                    size,
+                    PUBLIC_MAX_MAP_SIZE,
+                )
+                raise ValueError(
+                    f"{size_name} exceeds the maximum allowed size for public access "
+                    f"{PUBLIC_MAX_MAP_SIZE}."
+                )
+
+    dtm_provider = get_dtm_provider(payload.dtm_code)
+    if not dtm_provider:
+        raise ValueError(f"DTM provider with code {payload.dtm_code} not found.")
+
+    dtm_provider_settings = None
+    if dtm_provider.settings_required():
+        logger.debug("DTM provider requires settings, will validate provided settings.")
+        if not payload.dtm_settings:
+            raise ValueError(
+                "Specified DTM Provider requires additional settings, but none were provided."
+            )
+
+        # SECURITY: Sanitize DTM settings to prevent injection
+        try:
+            sanitize_dict_values(payload.dtm_settings)
+        except SecurityValidationError as e:
+            logger.error("Security validation failed for DTM provider settings: %s", e)
+            raise ValueError(f"Invalid DTM provider settings: {e}")
+
+        logger.debug("Validating DTM provider settings: %s", payload.dtm_settings)
+        try:
+            dtm_provider_settings = build_dtm_settings(dtm_provider, payload.dtm_settings)
+            logger.debug("DTM provider settings validated successfully.")
+        except Exception as e:
+            logger.error("Failed to validate DTM provider settings: %s", e)
+            raise ValueError(f"Invalid DTM provider settings: {e}")
+
+    custom_osm_path = None
+    if payload.custom_osm_path and not payload.custom_osm_xml:
+        # SECURITY: Validate and sanitize user-provided path
+        try:
+            validate_filename(payload.custom_osm_path)
+            custom_osm_path = safe_path_join(Paths.OSM_DEFAULTS_DIR, payload.custom_osm_path)
+            validate_path_exists(custom_osm_path, must_be_file=True)
+        except SecurityValidationError as e:
+            logger.error("Security validation failed for custom OSM path: %s", e)
+            raise ValueError(f"Invalid custom OSM path: {e}")
+
+    custom_background_path = None
+    if payload.custom_dem_path:
+        # SECURITY: Validate and sanitize user-provided path
+        try:
+            validate_filename(payload.custom_dem_path)
+            custom_background_path = safe_path_join(Paths.DEM_DEFAULTS_DIR, payload.custom_dem_path)
+            validate_path_exists(custom_background_path, must_be_file=True)
+        except SecurityValidationError as e:
+            logger.error("Security validation failed for custom DEM path: %s", e)
+            raise ValueError(f"Invalid custom DEM path: {e}")
+
+    custom_template_path = None
+    if payload.custom_map_template_path:
+        # SECURITY: Validate and sanitize user-provided path
+        try:
+            validate_filename(payload.custom_map_template_path)
+            templates_base = os.path.join(
+                Paths.TEMPLATES_DIR,
+                payload.game_code.lower(),
+                "map_templates",
+            )
+            custom_template_path = safe_path_join(templates_base, payload.custom_map_template_path)
+            validate_path_exists(custom_template_path, must_be_file=True)
+        except SecurityValidationError as e:
+            logger.error("Security validation failed for custom map template path: %s", e)
+            raise ValueError(f"Invalid custom map template path: {e}")
+
+    for schema_type, field_name in CUSTOM_SCHEMA_FIELDS:
+        schema_file_name = getattr(payload, field_name)
+        if schema_file_name:
+            resolve_schema_path(payload.game_code.lower(), schema_type, schema_file_name)
+
+    return ValidatedPayload(
+        dtm_provider=dtm_provider,
+        dtm_provider_settings=dtm_provider_settings,
+        custom_osm_path=custom_osm_path,
+        custom_background_path=custom_background_path,
+        custom_template_path=custom_template_path,
+    )
+
+
+def resolve_schema_path(
+    game_code: str, schema_type: Literal["texture", "tree", "buildings"], file_name: str
+) -> str:
+    """Validates the user-provided name of a custom schema file and resolves its path.
+
+    Arguments:
+        game_code (str): The game code.
+        schema_type (Literal["texture", "tree", "buildings"]): The type of the schema.
+        file_name (str): The name of the schema file.
+
+    Raises:
+        ValueError: If the filename is unsafe or the schema file does not exist.
+
+    Returns:
+        str: The resolved path of the schema file.
+    """
+    # SECURITY: Validate filename before using it
+    try:
+        validate_filename(file_name)
+    except SecurityValidationError as e:
+        logger.error("Security validation failed for schema filename: %s", e)
+        raise ValueError(f"Invalid schema filename: {e}")
+
+    # SECURITY: Use safe path join to prevent path traversal
+    try:
+        schemas_base = os.path.join(Paths.TEMPLATES_DIR, game_code, SCHEMA_DIRS[schema_type])
+        file_path = safe_path_join(schemas_base, file_name)
+        validate_path_exists(file_path, must_be_file=True)
+    except SecurityValidationError as e:
+        logger.error("Security validation failed for schema path: %s", e)
+        raise ValueError(f"Invalid schema path: {e}")
+
+    return file_path
+
+
+@functools.lru_cache(maxsize=64)
+def get_dtm_provider(dtm_code: str) -> Any:
+    """Finds the DTM provider class by its code, the lookup result is cached.
+    Only the provider classes are cached, games are created for each task since
+    their components are modified.
+
+    Arguments:
+        dtm_code (str): The code of the DTM provider.
+
+    Returns:
+        Any: The DTM provider class or None if not found.
+    """
+    return mfs.DTMProvider.get_provider_by_code(dtm_code)
+
+
+def build_dtm_settings(dtm_provider: Any, dtm_settings: dict[str, Any]) -> Any:
+    """Validates the settings of the DTM provider. Validated settings are cached, so repeated
+    payloads with the same settings reuse the model instead of validating it again.
+    Settings with unhashable values (e.g. nested lists) are validated on every call.
+    The values are keyed together with their types, since 1, 1.0 and True are equal as
+    cache keys but may be validated differently.
+
+    Arguments:
+        dtm_provider (Any): The DTM provider class.
+        dtm_settings (dict[str, Any]): The settings provided in the payload.
+
+    Returns:
+        Any: The validated DTM provider settings, a copy of the cached model for each call.
+    """
+    frozen_items = tuple(sorted((key, type(value), value) for key, value in dtm_settings.items()))
+    try:
+        hash(frozen_items)
+    except TypeError:
+        return dtm_provider.settings()(**dtm_settings)
+    return _build_dtm_settings(dtm_provider, frozen_items).model_copy()
+
+
+@functools.lru_cache(maxsize=256)
+def _build_dtm_settings(dtm_provider: Any, frozen_items: tuple[tuple[str, type, Any], ...]) -> Any:
+    """Cached validation of the DTM provider settings, see build_dtm_settings.
+
+    Arguments:
+        dtm_provider (Any): The DTM provider class.
+        frozen_items (tuple[tuple[str, type, Any], ...]): Sorted items of the settings, with
+            the type of each value.
+
+    Returns:
+        Any: The validated DTM provider settings.
+    """
+    return dtm_provider.settings()(**{key: value for key, _, value in frozen_items})
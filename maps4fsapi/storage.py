@@ -101,5 +101,4 @@ class Storage(metaclass=Singleton):
             key (str): The unique key for the entry.
         """
         logger.debug("Removing entry from storage: %s", key)
-        if key in self.cache:
-            self.pop_entry(key)
+        self.pop_entry(key)
@@ -1,35 +1,110 @@
 """This module provides functionality for managing tasks related to map generation."""
 
-import json
+import functools
+import itertools
+import logging
+import operator
 import os
-import queue
 import threading
-import zipfile
 from collections import deque
-from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, perf_counter
 from typing import Any, Callable, Literal, NamedTuple
 
 import maps4fs as mfs
+import orjson
 from maps4fs.generator.constants import Paths
 
 from maps4fsapi.components.models import MainSettingsPayload
 from maps4fsapi.config import (
+    MAX_IO_WORKERS,
+    MAX_PARALLEL_TASKS,
+    MAX_QUEUE_SIZE,
     MFS_CUSTOM_OSM_DIR,
-    PUBLIC_MAX_MAP_SIZE,
     Singleton,
     human_readable_time_diff,
-    is_public,
     logger,
     rounded_time_now,
 )
+from maps4fsapi.files import files_to_archive, osm_str_to_xml
+from maps4fsapi.payloads import (
+    CUSTOM_SCHEMA_FIELDS,
+    resolve_schema_path,
+    validate_payload,
+)
 from maps4fsapi.storage import Storage, StorageEntry
-from maps4fsapi.validation import (
-    SecurityValidationError,
-    safe_path_join,
-    sanitize_dict_values,
-    validate_filename,
-    validate_path_exists,
+
+# For how long (in seconds) the snapshot of all tasks can be served from cache.
+ALL_TASKS_CACHE_TTL = 1.0
+# Runs file I/O of the tasks, so it overlaps with the rest of the task preparation.
+IO_POOL = ThreadPoolExecutor(max_workers=MAX_IO_WORKERS, thread_name_prefix="mfs-io")
+# Payload fields included in the log summary of a task, large fields like OSM data are excluded.
+PAYLOAD_SUMMARY_FIELDS = (
+    "game_code",
+    "dtm_code",
+    "lat",
+    "lon",
+    "size",
+    "output_size",
+    "rotation",
+    "is_public",
+    "custom_texture_schema_path",
+    "custom_tree_schema_path",
+    "custom_map_template_path",
+    "custom_buildings_schema_path",
 )
+# Reads all the summary fields of a payload at once.
+PAYLOAD_SUMMARY_GETTER = operator.attrgetter(*PAYLOAD_SUMMARY_FIELDS)
+# Window (in seconds) of the recently finished tasks used for the load statistics.
+RECENT_STATS_WINDOW = 600.0
+# Smoothing factor of the processing time estimates, higher values favour recent tasks.
+PROCESSING_TIME_EWMA_ALPHA = 0.2
+
+
+def size_bucket(size: int) -> int:
+    """Get the bucket of the map size used to group processing time estimates.
+    Sizes are rounded down to a power of two, e.g. 2048 and 3000 are both in the 2048 bucket.
+
+    Arguments:
+        size (int): Size of the map in meters.
+
+    Returns:
+        int: The size bucket.
+    """
+    return 1 << (size.bit_length() - 1) if size > 0 else 0
+
+
+@functools.lru_cache(maxsize=512)
+def format_status(status: str, minutes_ago: int | None) -> str:
+    """Format the status text of a task, e.g. "Completed 5 minutes ago".
+    The human-readable time only changes once per minute, so the results are cached
+    by the whole minutes that passed since the status was set.
+
+    Arguments:
+        status (str): The status of the task.
+        minutes_ago (int | None): Whole minutes since the status was set, None if unknown.
+
+    Returns:
+        str: The formatted status text.
+    """
+    human_time = ""
+    if minutes_ago is not None:
+        human_time = human_readable_time_diff(minutes_ago * 60)
+    return f"{status} {human_time}"
+
+
+@functools.lru_cache(maxsize=256)
+def format_coordinates(coordinates: tuple[int, int]) -> str:
+    """Format the rounded coordinates of a task, e.g. "45, 20".
+    Entries never change their coordinates, so the text is cached between status polls.
+
+    Arguments:
+        coordinates (tuple[int, int]): The rounded coordinates of the task.
+
+    Returns:
+        str: The formatted coordinates text.
+    """
+    return f"{coordinates[0]}, {coordinates[1]}"
 
 
 class HistoryEntry(NamedTuple):
@@ -43,19 +118,22 @@ class HistoryEntry(NamedTuple):
     # Tasks that wait in queue do not have a timestamp yet.
     timestamp: int
 
-    def to_json(self) -> dict[str, str | int]:
+    def to_json(self, now: int | None = None) -> dict[str, str | int]:
         """Convert the HistoryEntry to a JSON-serializable dictionary.
 
+        Arguments:
+            now (int | None): The current rounded epoch time. Allows to share a single
+                timestamp when serializing several entries, if None, the current time is used.
+
         Returns:
             dict[str, str | int]: A dictionary representation of the HistoryEntry.
         """
-        time_diff = rounded_time_now() - self.timestamp if self.timestamp else None
-        human_time = ""
-        if time_diff is not None:
-            human_time = human_readable_time_diff(time_diff)
+        if now is None:
+            now = rounded_time_now()
+        minutes_ago = (now - self.timestamp) // 60 if self.timestamp else None
 
-        status_text = f"{self.status} {human_time}"
-        coordinates_text = f"{self.coordinates[0]}, {self.coordinates[1]}"
+        status_text = format_status(self.status, minutes_ago)
+        coordinates_text = format_coordinates(self.coordinates)
 
         return {
             "coordinates": coordinates_text,
@@ -65,26 +143,61 @@ class HistoryEntry(NamedTuple):
         }
 
 
+class QueueFullError(Exception):
+    """Exception raised when a task is added while the queue is full."""
+
+
 class TasksQueue(metaclass=Singleton):
     """A singleton class that manages a queue of tasks for map generation."""
 
-    def __init__(self):
-        self.tasks = queue.Queue()
-        self.history = deque(maxlen=20)
-        self.active_sessions = set()  # Track session names currently in queue or processing
-        self.active_sessions_info = []
-        self.processing_now = None
-        self.processing_now_info = None
+    def __init__(self) -> None:
+        # Queued tasks in FIFO order, consumed by all workers.
+        self.tasks: deque[tuple[Any, ...]] = deque()
+        self.history: deque[HistoryEntry] = deque(maxlen=20)
+        # Queued sessions in FIFO order, keyed by session name for O(1) lookups and removals.
+        self.active_sessions_info: dict[str, HistoryEntry] = {}
+        # Sessions that are being processed right now, keyed by session name.
+        self.processing_now: dict[str, HistoryEntry] = {}
         self.completed_tasks = 0
         self.failed_tasks = 0
         self.processing_time = 0.0  # In minutes.
-        self.worker = threading.Thread(target=self._worker, daemon=True)
-        self.worker.start()
+        # Smoothed processing time (in minutes) of completed tasks per (game code, size bucket).
+        self._processing_time_estimates: dict[tuple[str, int], float] = {}
+        # Recently finished tasks as (finish monotonic time, elapsed seconds, completed).
+        self._recent: deque[tuple[float, float, bool]] = deque(maxlen=600)
+        # Guards the bookkeeping above, which is mutated by the worker thread
+        # and read by the API request threads.
+        self._lock = threading.Lock()
+        # Notifies an idle worker that a new task was added, shares the lock above.
+        self._has_tasks = threading.Condition(self._lock)
+        # Incremented on every change of the state above, invalidates the cached snapshot.
+        self._state_version = 0
+        # Cached get_all_task_info result as (state version, expiry time, tasks info).
+        self._all_tasks_cache: tuple[int, float, list[dict[str, str | int]]] | None = None
+        # Workers are started on the first added task, so importing the module or creating
+        # the queue does not spawn threads.
+        self.workers = [
+            threading.Thread(target=self._worker, daemon=True) for _ in range(MAX_PARALLEL_TASKS)
+        ]
+        self._workers_started = False
+
+    def _ensure_started(self) -> None:
+        """Start the worker threads if they are not running yet."""
+        with self._lock:
+            if self._workers_started:
+                return
+            self._workers_started = True
+        for worker in self.workers:
+            worker.start()
 
     def add_task(
         self, session_name: str, func: Callable, payload: MainSettingsPayload, *args, **kwargs
-    ):
+    ) -> bool:
         """Adds a task to the queue with a session name identifier.
+        If a task with the same session name is already queued or being processed, the new one
+        is not added: both would work in the same directory and the session name would be
+        reported as finished as soon as the first one completes. The caller gets the result
+        of the existing task by the same session name.
 
         Arguments:
             session_name (str): Unique session identifier for the task.
@@ -92,8 +205,13 @@ class TasksQueue(metaclass=Singleton):
             payload (MainSettingsPayload): The payload containing settings for the task.
             *args: Positional arguments to pass to the function.
             **kwargs: Keyword arguments to pass to the function.
+
+        Raises:
+            QueueFullError: If MAX_QUEUE_SIZE tasks are already waiting in the queue.
+
+        Returns:
+            bool: True if the task was added, False if the session is already active.
         """
-        self.active_sessions.add(session_name)
         entry = HistoryEntry(
             session_name=session_name,
             coordinates=(int(payload.lat), int(payload.lon)),
@@ -102,16 +220,38 @@ class TasksQueue(metaclass=Singleton):
             status="Added to queue",
             timestamp=rounded_time_now(),
         )
-        self.active_sessions_info.append(entry)
-
-        self.tasks.put((session_name, func, payload, args, kwargs))
-        queue_size = self.tasks.qsize()
-        logger.info(
-            "Adding task to queue: %s (session: %s), queue size: %d",
-            func.__name__,
-            session_name,
-            queue_size,
-        )
+        self._ensure_started()
+        with self._has_tasks:
+            if session_name in self.active_sessions_info or session_name in self.processing_now:
+                logger.info("Session %s is already active, task was not added.", session_name)
+                return False
+            # Bounded by the queued entries themselves, they hold the payloads in memory.
+            if len(self.tasks) >= MAX_QUEUE_SIZE:
+                raise QueueFullError(
+                    f"The queue is full ({MAX_QUEUE_SIZE} tasks), please try again later."
+                )
+            self.active_sessions_info[session_name] = entry
+            self._state_version += 1
+            self.tasks.append((session_name, func, payload, args, kwargs, entry))
+            self._has_tasks.notify()
+        # Counting the queued tasks takes the lock, so it's skipped if the message is filtered out.
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Adding task to queue: %s (session: %s), queue size: %d",
+                func.__name__,
+                session_name,
+                self.queue_size(),
+            )
+        return True
+
+    def queue_size(self) -> int:
+        """Get the number of tasks waiting in the queue.
+
+        Returns:
+            int: The number of queued tasks.
+        """
+        with self._lock:
+            return len(self.tasks)
 
     def seconds_to_minutes(self, seconds: float) -> float:
         """Convert seconds to whole minutes.
@@ -130,24 +270,56 @@ class TasksQueue(metaclass=Singleton):
         Returns:
             float: The average processing time in minutes, or 0 if no tasks have been completed.
         """
-        if self.completed_tasks == 0:
+        with self._lock:
+            completed_tasks = self.completed_tasks
+            processing_time = self.processing_time
+        if completed_tasks == 0:
             return 0.0
-        return round(self.processing_time / self.completed_tasks, 1)
+        return round(processing_time / completed_tasks, 1)
+
+    def stats(self) -> dict[str, float]:
+        """Get the load statistics of the tasks finished within the last RECENT_STATS_WINDOW
+        seconds. Unlike the lifetime counters, they show how busy the service is right now.
+
+        Returns:
+            dict[str, float]: Finished tasks per minute and average processing time
+                of the completed tasks in seconds.
+        """
+        cutoff = monotonic() - RECENT_STATS_WINDOW
+        with self._lock:
+            recent = [record for record in self._recent if record[0] >= cutoff]
+        completed_times = [elapsed for _, elapsed, completed in recent if completed]
+        avg_latency = sum(completed_times) / len(completed_times) if completed_times else 0.0
+        return {
+            "throughput_per_min": round(len(recent) / (RECENT_STATS_WINDOW / 60), 2),
+            "avg_latency_s": round(avg_latency, 1),
+        }
 
     def wait_in_queue(self, position: int | None = None) -> float:
-        """Estimate the wait time in the queue based on average processing time and active tasks.
+        """Estimate the wait time in the queue as the sum of the expected processing times
+        of the tasks ahead, divided by the number of workers processing them in parallel.
+        The expected time is learned per game and map size bucket, the average processing
+        time of the recently completed tasks (or the lifetime average, if there are none)
+        is used for buckets without completed tasks yet.
 
         Arguments:
             position (int | None): The position in the queue to estimate wait time for.
-                If None, uses the total number of active tasks.
+                If None, the wait time behind all active tasks is estimated.
 
         Returns:
             float: Estimated wait time in minutes.
         """
-        active_tasks = position or self.get_active_tasks_count()
-        avg_time = self.average_processing_time()
-        estimated_wait = active_tasks * avg_time
-        return round(estimated_wait, 1)
+        avg_time = self.stats()["avg_latency_s"] / 60 or self.average_processing_time()
+        with self._lock:
+            ahead = list(self.processing_now.values())
+            ahead.extend(itertools.islice(self.active_sessions_info.values(), position))
+            estimated_wait = sum(
+                self._processing_time_estimates.get(
+                    (entry.game_code, size_bucket(entry.size)), avg_time
+                )
+                for entry in ahead
+            )
+        return round(estimated_wait / len(self.workers), 1)
 
     def get_queue_position(self, session_name: str) -> int | None:
         """Get the position of a task in the queue based on its session name.
@@ -158,10 +330,20 @@ class TasksQueue(metaclass=Singleton):
         Returns:
             int | None: The position in the queue (0-based index), or None if not found.
         """
-        if not self.is_in_queue(session_name):
-            return None
-        for idx, session_info in enumerate(self.active_sessions_info):
-            if session_info.session_name == session_name:
+        with self._lock:
+            return self._get_queue_position(session_name)
+
+    def _get_queue_position(self, session_name: str) -> int | None:
+        """Get the position of a task in the queue, the caller must hold the lock.
+
+        Arguments:
+            session_name (str): The session name to check.
+
+        Returns:
+            int | None: The position in the queue (0-based index), or None if not found.
+        """
+        for idx, queued_session_name in enumerate(self.active_sessions_info):
+            if queued_session_name == session_name:
                 return idx
         return None
 
@@ -174,9 +356,10 @@ class TasksQueue(metaclass=Singleton):
         Returns:
             tuple[bool, bool, int | None, float]: A tuple containing the queue status information.
         """
-        in_queue = self.is_in_queue(session_name)
-        processing = self.is_processing(session_name)
-        position = self.get_queue_position(session_name) if in_queue else None
+        with self._lock:
+            processing = session_name in self.processing_now
+            in_queue = processing or session_name in self.active_sessions_info
+            position = self._get_queue_position(session_name) if in_queue else None
         estimated_wait = self.wait_in_queue(position) if in_queue else 0.0
 
         return (in_queue, processing, position, estimated_wait)
@@ -188,19 +371,36 @@ class TasksQueue(metaclass=Singleton):
         Returns:
             tuple[int, int]: A tuple containing the number of completed tasks and failed tasks.
         """
-        return self.completed_tasks, self.failed_tasks
+        with self._lock:
+            return self.completed_tasks, self.failed_tasks
 
     def get_all_task_info(self) -> list[dict[str, str | int]]:
         """Retrieve information about all tasks: queued, processing, and completed.
+        The result is cached until the queue state changes, but for no longer than
+        ALL_TASKS_CACHE_TTL seconds, so the human-readable times stay fresh.
 
         Returns:
             list[dict[str, str | int]]: A list of dictionaries containing task information.
         """
-        queued_tasks = self.active_sessions_info
-        processing_task = [self.processing_now_info] if self.processing_now_info else []
-        completed_tasks = list(self.history)
-        all_tasks = completed_tasks + processing_task + queued_tasks
-        return [task.to_json() for task in all_tasks]
+        with self._lock:
+            state_version = self._state_version
+            if self._all_tasks_cache is not None:
+                cached_version, expires_at, cached_tasks = self._all_tasks_cache
+                if cached_version == state_version and monotonic() < expires_at:
+                    return cached_tasks
+            all_tasks = list(
+                itertools.chain(
+                    self.history, self.processing_now.values(), self.active_sessions_info.values()
+                )
+            )
+        now = rounded_time_now()
+        tasks_info = [task.to_json(now) for task in all_tasks]
+
+        with self._lock:
+            if self._state_version == state_version:
+                expires_at = monotonic() + ALL_TASKS_CACHE_TTL
+                self._all_tasks_cache = (state_version, expires_at, tasks_info)
+        return tasks_info
 
     def is_in_queue(self, session_name: str) -> bool:
         """Check if a task with the given session name is currently in queue or being processed.
@@ -211,7 +411,8 @@ class TasksQueue(metaclass=Singleton):
         Returns:
             bool: True if session is active (queued or processing), False otherwise.
         """
-        return session_name in self.active_sessions
+        with self._lock:
+            return session_name in self.active_sessions_info or session_name in self.processing_now
 
     def is_processing(self, session_name: str) -> bool:
         """Check if a task with the given session name is currently being processed.
@@ -222,26 +423,29 @@ class TasksQueue(metaclass=Singleton):
         Returns:
             bool: True if session is currently being processed, False otherwise.
         """
-        return session_name == self.processing_now
+        with self._lock:
+            return session_name in self.processing_now
 
     def what_is_processing(self) -> HistoryEntry | None:
         """Get information about the task that is currently being processed.
+        If several tasks are processed in parallel, returns the one that started first.
 
         Returns:
             HistoryEntry | None: Information about the currently processing task,
                 or None if no task is being processed.
         """
-        return self.processing_now_info
+        with self._lock:
+            return next(iter(self.processing_now.values()), None)
 
     def remove_active_session(self, session_name: str) -> None:
-        """Removes a session name from the active sessions info set.
+        """Removes a session name from the queued sessions info.
 
         Arguments:
             session_name (str): The session name to remove.
         """
-        entry = next((e for e in self.active_sessions_info if e.session_name == session_name), None)
-        if entry:
-            self.active_sessions_info.remove(entry)
+        with self._lock:
+            self.active_sessions_info.pop(session_name, None)
+            self._state_version += 1
 
     def get_active_tasks_count(self) -> int:
         """Get the total number of active tasks (queued + processing).
@@ -249,35 +453,35 @@ class TasksQueue(metaclass=Singleton):
         Returns:
             int: The total number of active tasks.
         """
-        return len(self.active_sessions)
+        with self._lock:
+            return len(self.active_sessions_info) + len(self.processing_now)
 
-    def _worker(self):
+    def _worker(self) -> None:
         while True:
-            session_name, func, payload, args, kwargs = self.tasks.get()
-            self.processing_now = session_name
-            self.processing_now_info = HistoryEntry(
-                session_name=session_name,
-                coordinates=(int(payload.lat), int(payload.lon)),
-                game_code=payload.game_code.upper(),
-                size=payload.size,
-                status="Started processing",
-                timestamp=rounded_time_now(),
-            )
-            self.remove_active_session(session_name)
-            history_status = "Failed"
+            with self._has_tasks:
+                while not self.tasks:
+                    self._has_tasks.wait()
+                # Tasks are started in the order they were added, which is the order
+                # of active_sessions_info, so the reported queue positions are exact.
+                session_name, func, payload, args, kwargs, entry = self.tasks.popleft()
+                self.processing_now[session_name] = entry._replace(
+                    status="Started processing", timestamp=rounded_time_now()
+                )
+                self.active_sessions_info.pop(session_name, None)
+                self._state_version += 1
+            history_status: Literal["Completed", "Failed"] = "Failed"
+            start_time = perf_counter()
             try:
-                start_time = perf_counter()
                 res = func(session_name, payload, *args, **kwargs)
                 if res:
-                    remaining_tasks = self.tasks.qsize()
-                    logger.info(
-                        "Task completed: %s (session: %s), remaining tasks: %d",
-                        func.__name__,
-                        session_name,
-                        remaining_tasks,
-                    )
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info(
+                            "Task completed: %s (session: %s), remaining tasks: %d",
+                            func.__name__,
+                            session_name,
+                            self.queue_size(),
+                        )
                     history_status = "Completed"
-                    self.completed_tasks += 1
                 else:
                     logger.error(
                         "Task %s (session: %s) did not complete successfully.",
@@ -285,39 +489,39 @@ class TasksQueue(metaclass=Singleton):
                         session_name,
                     )
                     history_status = "Failed"
-                    self.failed_tasks += 1
             except Exception as e:
-                self.failed_tasks += 1
-                remaining_tasks = self.tasks.qsize()
-                logger.error(
+                remaining_tasks = self.queue_size()
+                # Not re-raised, the worker has to stay alive to process the next tasks.
+                logger.exception(
                     "Task %s (session: %s) failed with error: %s, remaining tasks: %d",
                     func.__name__,
                     session_name,
                     e,
                     remaining_tasks,
                 )
-                raise
             finally:
-                # Remove session from active set when task completes or fails
-                self.active_sessions.discard(session_name)
-                self.tasks.task_done()
-                self.processing_now = None
-                self.processing_now_info = None
-
-                history_entry = HistoryEntry(
-                    session_name=session_name,
-                    coordinates=(int(payload.lat), int(payload.lon)),
-                    game_code=payload.game_code.upper(),
-                    size=payload.size,
-                    status=history_status,
-                    timestamp=rounded_time_now(),
-                )
-
-                # Add the history entry to the processing history
-                self.history.append(history_entry)
+                history_entry = entry._replace(status=history_status, timestamp=rounded_time_now())
                 end_time = perf_counter()
                 elapsed_time = end_time - start_time
-                self.processing_time += self.seconds_to_minutes(elapsed_time)
+
+                with self._lock:
+                    self.processing_now.pop(session_name, None)
+                    self._state_version += 1
+                    if history_status == "Completed":
+                        self.completed_tasks += 1
+                        elapsed_minutes = elapsed_time / 60
+                        key = (history_entry.game_code, size_bucket(history_entry.size))
+                        previous = self._processing_time_estimates.get(key, elapsed_minutes)
+                        self._processing_time_estimates[key] = (
+                            PROCESSING_TIME_EWMA_ALPHA * elapsed_minutes
+                            + (1 - PROCESSING_TIME_EWMA_ALPHA) * previous
+                        )
+                    else:
+                        self.failed_tasks += 1
+                    # Add the history entry to the processing history
+                    self.history.append(history_entry)
+                    self.processing_time += self.seconds_to_minutes(elapsed_time)
+                    self._recent.append((monotonic(), elapsed_time, history_status == "Completed"))
                 logger.info(
                     "Session: %s finished in %.2f seconds.",
                     session_name,
@@ -370,80 +574,42 @@ def task_generation(
     Returns:
         bool: True if the task completed successfully, False otherwise.
     """
+    # Bound before the task starts, so the entry can always be stored, whenever the task stops.
+    success = False
+    description = "Task was interrupted."
     task_directory = None
     output_path = None
+    previews: list[str] = []
     try:
-        # Log payload without the potentially huge OSM data
-        payload_summary = {
-            "game_code": payload.game_code,
-            "dtm_code": payload.dtm_code,
-            "lat": payload.lat,
-            "lon": payload.lon,
-            "size": payload.size,
-            "output_size": payload.output_size,
-            "rotation": payload.rotation,
-            "is_public": payload.is_public,
-            "has_custom_osm": hasattr(payload, "custom_osm_xml")
-            and payload.custom_osm_xml is not None,
-            "has_custom_osm_path": hasattr(payload, "custom_osm_path")
-            and payload.custom_osm_path is not None,
-            "has_custom_dem_path": hasattr(payload, "custom_dem_path")
-            and payload.custom_dem_path is not None,
-            "custom_texture_schema_path": payload.custom_texture_schema_path,
-            "custom_tree_schema_path": payload.custom_tree_schema_path,
-            "custom_map_template_path": payload.custom_map_template_path,
-            "custom_buildings_schema_path": payload.custom_buildings_schema_path,
-        }
-        logger.info("Starting task %s with payload summary: %s", session_name, payload_summary)
-        success = True
-        description = "Task completed successfully."
-
-        if not isinstance(payload, MainSettingsPayload):
-            raise TypeError("Payload must be an instance of MainSettingsPayload")
+        validated = validate_payload(payload)
+        if logger.isEnabledFor(logging.INFO):
+            # Log payload without the potentially huge OSM data
+            payload_summary = dict(zip(PAYLOAD_SUMMARY_FIELDS, PAYLOAD_SUMMARY_GETTER(payload)))
+            payload_summary["has_custom_osm"] = payload.custom_osm_xml is not None
+            payload_summary["has_custom_osm_path"] = payload.custom_osm_path is not None
+            payload_summary["has_custom_dem_path"] = payload.custom_dem_path is not None
+            logger.info("Starting task %s with payload summary: %s", session_name, payload_summary)
         game_code = payload.game_code.lower()
+        # Custom schemas are loaded in the background while the rest of the settings are prepared.
+        schema_futures = {
+            schema_type: IO_POOL.submit(
+                load_custom_schemas, game_code, schema_type, getattr(payload, field_name)
+            )
+            for schema_type, field_name in CUSTOM_SCHEMA_FIELDS
+            if getattr(payload, field_name)
+        }
         game = mfs.Game.from_code(game_code.upper())
         if components:
             logger.debug("Setting components for the game: %s", components)
             game.set_components_by_names(components)
-        dtm_provider = mfs.DTMProvider.get_provider_by_code(payload.dtm_code)
-
-        if not dtm_provider:
-            raise ValueError(f"DTM provider with code {payload.dtm_code} not found.")
-
-        dtm_provider_settings = None
-        if dtm_provider.settings_required():
-            logger.debug("DTM provider requires settings, will validate provided settings.")
-            if not payload.dtm_settings:
-                raise ValueError(
-                    "Specified DTM Provider requires additional settings, but none were provided."
-                )
-
-            # SECURITY: Sanitize DTM settings to prevent injection
-            try:
-                sanitize_dict_values(payload.dtm_settings)
-            except SecurityValidationError as e:
-                logger.error("Security validation failed for DTM provider settings: %s", e)
-                raise ValueError(f"Invalid DTM provider settings: {e}")
-
-            logger.debug("Validating DTM provider settings: %s", payload.dtm_settings)
-            try:
-                dtm_provider_settings = dtm_provider.settings()(**payload.dtm_settings)
-                logger.debug("DTM provider settings validated successfully.")
-            except Exception as e:
-                logger.error("Failed to validate DTM provider settings: %s", e)
-                raise
 
         coordinates = (payload.lat, payload.lon)
         task_directory = os.path.join(Paths.DATA_DIR, session_name)
         os.makedirs(task_directory, exist_ok=True)
 
-        prepared_settings = {
-            attr: getattr(payload, attr)
-            for attr in dir(payload)
-            if attr.endswith("_settings") and hasattr(payload, attr)
-        }
         generation_settings_json = {}
-        for key, value in prepared_settings.items():
+        for key in payload.settings_fields():
+            value = getattr(payload, key)
             if isinstance(value, mfs.settings.SettingsModel):
                 new_value = value.model_dump()
             elif isinstance(value, dict):
@@ -457,87 +623,48 @@ def task_generation(
         )
 
         custom_osm = None
+        osm_future = None
         if payload.custom_osm_xml:
-            try:
-                save_path = os.path.join(MFS_CUSTOM_OSM_DIR, f"{session_name}_custom.osm")
-                osm_str_to_xml(payload.custom_osm_xml, save_path)
-                custom_osm = save_path
-            except Exception as e:
-                logger.error("Failed to convert custom OSM XML: %s", e)
-                raise ValueError(f"Error processing custom OSM data: {e}")
-        elif payload.custom_osm_path:
-            # SECURITY: Validate and sanitize user-provided path
-            try:
-                validate_filename(payload.custom_osm_path)
-                expected_osm_path = safe_path_join(Paths.OSM_DEFAULTS_DIR, payload.custom_osm_path)
-                validate_path_exists(expected_osm_path, must_be_file=True)
-            except SecurityValidationError as e:
-                logger.error("Security validation failed for custom OSM path: %s", e)
-                raise ValueError(f"Invalid custom OSM path: {e}")
-
-            logger.info("Using custom OSM file from path: %s", expected_osm_path)
-            custom_osm = expected_osm_path
-
-        custom_background_path = None
-        if payload.custom_dem_path:
-            # SECURITY: Validate and sanitize user-provided path
-            try:
-                validate_filename(payload.custom_dem_path)
-                expected_dem_path = safe_path_join(Paths.DEM_DEFAULTS_DIR, payload.custom_dem_path)
-                validate_path_exists(expected_dem_path, must_be_file=True)
-            except SecurityValidationError as e:
-                logger.error("Security validation failed for custom DEM path: %s", e)
-                raise ValueError(f"Invalid custom DEM path: {e}")
+            # Written in the background, while the rest of the settings are being prepared.
+            save_path = os.path.join(MFS_CUSTOM_OSM_DIR, f"{session_name}_custom.osm")
+            osm_future = IO_POOL.submit(osm_str_to_xml, payload.custom_osm_xml, save_path)
+        elif validated.custom_osm_path:
+            logger.info("Using custom OSM file from path: %s", validated.custom_osm_path)
+            custom_osm = validated.custom_osm_path
 
-            logger.info("Using custom DEM file from path: %s", expected_dem_path)
-            custom_background_path = expected_dem_path
+        if validated.custom_background_path:
+            logger.info("Using custom DEM file from path: %s", validated.custom_background_path)
 
         texture_custom_schema = None
         tree_custom_schema = None
         buildings_custom_schema = None
-        if payload.custom_texture_schema_path:
-            texture_custom_schema = load_custom_schemas(
-                game_code, "texture", payload.custom_texture_schema_path
-            )
+        if "texture" in schema_futures:
+            texture_custom_schema = schema_futures["texture"].result()
             logger.info("Loaded custom texture schema from: %s", payload.custom_texture_schema_path)
-        if payload.custom_tree_schema_path:
-            tree_custom_schema = load_custom_schemas(
-                game_code, "tree", payload.custom_tree_schema_path
-            )
+        if "tree" in schema_futures:
+            tree_custom_schema = schema_futures["tree"].result()
             logger.info("Loaded custom tree schema from: %s", payload.custom_tree_schema_path)
-        if payload.custom_buildings_schema_path:
-            buildings_custom_schema = load_custom_schemas(
-                game_code, "buildings", payload.custom_buildings_schema_path
-            )
+        if "buildings" in schema_futures:
+            buildings_custom_schema = schema_futures["buildings"].result()
             logger.info(
                 "Loaded custom buildings schema from: %s", payload.custom_buildings_schema_path
             )
 
-        custom_template_path = None
-        if payload.custom_map_template_path:
-            # SECURITY: Validate and sanitize user-provided path
-            try:
-                validate_filename(payload.custom_map_template_path)
-                templates_base = os.path.join(
-                    Paths.TEMPLATES_DIR,
-                    game_code,
-                    "map_templates",
-                )
-                full_template_path = safe_path_join(
-                    templates_base, payload.custom_map_template_path
-                )
-                validate_path_exists(full_template_path, must_be_file=True)
-            except SecurityValidationError as e:
-                logger.error("Security validation failed for custom map template path: %s", e)
-                raise ValueError(f"Invalid custom map template path: {e}")
+        if validated.custom_template_path:
+            logger.info("Using custom map template from path: %s", validated.custom_template_path)
 
-            logger.info("Using custom map template from path: %s", full_template_path)
-            custom_template_path = full_template_path
+        if osm_future is not None:
+            try:
+                osm_future.result()
+                custom_osm = save_path
+            except Exception as e:
+                logger.error("Failed to convert custom OSM XML: %s", e)
+                raise ValueError(f"Error processing custom OSM data: {e}")
 
         mp = mfs.Map(
             game,
-            dtm_provider,
-            dtm_provider_settings,
+            validated.dtm_provider,
+            validated.dtm_provider_settings,
             coordinates,
             payload.size,
             payload.rotation,
@@ -546,41 +673,17 @@ def task_generation(
             custom_osm=custom_osm,
             is_public=payload.is_public,
             output_size=payload.output_size,
-            custom_background_path=custom_background_path,
+            custom_background_path=validated.custom_background_path,
             texture_custom_schema=texture_custom_schema,
             tree_custom_schema=tree_custom_schema,
-            custom_template_path=custom_template_path,
+            custom_template_path=validated.custom_template_path,
             buildings_custom_schema=buildings_custom_schema,
             origin=kwargs.get("origin", None),
             platform="docker",
         )
 
-        if is_public:
-            # logger.info("Running in public mode, will adjust map settings accordingly.")
-            # adjust_settings_for_public(mp)
-
-            if mp.size > PUBLIC_MAX_MAP_SIZE:
-                logger.warning(
-                    "Map size %s is larger than %s, will stop generation to prevent issues.",
-                    mp.size,
-                    PUBLIC_MAX_MAP_SIZE,
-                )
-                raise ValueError(
-                    f"Map size exceeds the maximum allowed size for public access {PUBLIC_MAX_MAP_SIZE}."
-                )
-
-            if mp.output_size is not None and mp.output_size > PUBLIC_MAX_MAP_SIZE:
-                logger.warning(
-                    "Output size %s is larger than %s, will stop generation to prevent issues.",
-                    mp.output_size,
-                    PUBLIC_MAX_MAP_SIZE,
-                )
-                raise ValueError(
-                    f"Output size exceeds the maximum allowed size for public access {PUBLIC_MAX_MAP_SIZE}."
-                )
-
-        for _ in mp.generate():
-            pass
+        # Drain the generator without buffering the yielded progress steps.
+        deque(mp.generate(), maxlen=0)
 
         previews = mp.previews()
 
@@ -601,7 +704,7 @@ def task_generation(
                         "No specific assets provided for component %s, generating all assets.",
                         component,
                     )
-                    outputs.extend(list(active_component.assets.values()))
+                    outputs.extend(active_component.assets.values())
         else:
             logger.debug("Working with a mode including all components.")
             archive_path = os.path.join(Paths.DATA_DIR, f"{session_name}.zip")
@@ -617,6 +720,8 @@ def task_generation(
         else:
             output_path = outputs[0]
 
+        success = True
+        description = "Task completed successfully."
         logger.info("Task %s completed successfully. Output saved to %s", session_name, output_path)
     except Exception as e:
         success = False
@@ -632,8 +737,8 @@ def task_generation(
             file_path=output_path,
             previews=previews,
         )
+        Storage().add_entry(session_name, storage_entry)
 
-    Storage().add_entry(session_name, storage_entry)
     return success
 
 
@@ -650,33 +755,15 @@ def load_custom_schemas(
         ValueError: If the schema file does not exist, is empty, or is not a valid list.
 
     Returns:
-        list[dict[str, Any]]: The loaded schema data.
+        list[dict[str, Any]]: The loaded schema data, parsed on every call, so each task gets
+            its own copy.
     """
-    # SECURITY: Validate filename before using it
-    try:
-        validate_filename(file_name)
-    except SecurityValidationError as e:
-        logger.error("Security validation failed for schema filename: %s", e)
-        raise ValueError(f"Invalid schema filename: {e}")
-
-    schema_dirs = {
-        "texture": "texture_schemas",
-        "tree": "tree_schemas",
-        "buildings": "buildings_schemas",
-    }
-
-    # SECURITY: Use safe path join to prevent path traversal
-    try:
-        schemas_base = os.path.join(Paths.TEMPLATES_DIR, game_code, schema_dirs[schema_type])
-        file_path = safe_path_join(schemas_base, file_name)
-        validate_path_exists(file_path, must_be_file=True)
-    except SecurityValidationError as e:
-        logger.error("Security validation failed for schema path: %s", e)
-        raise ValueError(f"Invalid schema path: {e}")
+    file_path = resolve_schema_path(game_code, schema_type, file_name)
 
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            schema_data = json.load(f)
+        file_stat = os.stat(file_path)
+        content = read_file_cached(file_path, file_stat.st_mtime_ns, file_stat.st_size)
+        schema_data = orjson.loads(content)
         logger.debug("Successfully loaded custom %s schema from: %s", schema_type, file_path)
     except Exception as e:
         logger.error("Failed to load custom %s schema from file: %s", schema_type, e)
@@ -693,17 +780,22 @@ def load_custom_schemas(
     return schema_data
 
 
-def files_to_archive(filepaths: list[str], archive_path: str) -> None:
-    """Creates a zip archive containing the specified files.
+@functools.lru_cache(maxsize=32)
+def read_file_cached(file_path: str, mtime_ns: int, size: int) -> bytes:
+    """Reads a file, the content is cached until the file is modified.
+    Only the raw bytes are cached: parsed objects would be shared between the tasks,
+    which may modify them.
 
     Arguments:
-        filepaths (list[str]): List of file paths to include in the archive.
-        archive_path (str): Path where the zip archive will be created.
+        file_path (str): The path to the file.
+        mtime_ns (int): The modification time of the file in nanoseconds, part of the cache key.
+        size (int): The size of the file in bytes, part of the cache key.
+
+    Returns:
+        bytes: The content of the file.
     """
-    with zipfile.ZipFile(archive_path, "w") as archive:
-        for filepath in filepaths:
-            if os.path.isfile(filepath):
-                archive.write(filepath, arcname=os.path.basename(filepath))
+    with open(file_path, "rb") as f:
+        return f.read()
 
 
 # def adjust_settings_for_public(mp: mfs.Map) -> None:
@@ -717,21 +809,3 @@ def files_to_archive(filepaths: list[str], archive_path: str) -> None:
 #     mp.background_settings.flatten_roads = False
 
 #     logger.debug("Adjusted map settings for public access.")
-
-
-def osm_str_to_xml(custom_osm_str: str, save_path: str) -> None:
-    """Converts an OSM stringified data to XML format and saves it to a file.
-
-    Arguments:
-        custom_osm_str (str): The OSM XML string to save.
-        save_path (str): The path to save the XML file.
-    """
-    try:
-        with open(save_path, "w", encoding="utf-8") as f:
-            f.write(custom_osm_str)
-
-        logger.debug("Successfully saved OSM XML to: %s", save_path)
-
-    except Exception as e:
-        logger.error("Failed to save OSM XML to file: %s", e)
-        raise ValueError(f"Error saving OSM data: {e}")
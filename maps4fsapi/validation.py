@@ -1,15 +1,39 @@
 """Input validation and sanitization utilities for security."""
 
+import functools
 import os
 import re
+import stat
 from pathlib import Path
-from typing import Any
+from typing import AbstractSet, Any
 
 
 class SecurityValidationError(ValueError):
     """Exception raised when security validation fails."""
 
 
+# Characters which are blocked in filenames to prevent command injection.
+DANGEROUS_FILENAME_CHARS = (";", "|", "&", "$", "`", "\n", "\r", "<", ">")
+# Matches anything that makes a filename unsafe: null bytes, path traversal, directory
+# separators and command injection characters.
+UNSAFE_FILENAME_PATTERN = re.compile(r"[\0/\\;|&$`\n\r<>]|\.\.")
+# Patterns of command injection attempts in string values.
+DANGEROUS_VALUE_PATTERNS = (
+    r";\s*wget",
+    r";\s*curl",
+    r"\$\(",  # Command substitution
+    r"`",  # Backtick execution
+    r"\|\s*sh",
+    r"\|\s*bash",
+    r"eval\s*\(",
+    r"exec\s*\(",
+    r"__import__",
+    r"subprocess",
+    r"os\.system",
+)
+DANGEROUS_VALUE_PATTERN = re.compile("|".join(DANGEROUS_VALUE_PATTERNS), re.IGNORECASE)
+
+
 def validate_filename(filename: str) -> bool:
     """Validate that a filename is safe and doesn't contain malicious patterns.
 
@@ -32,6 +56,13 @@ def validate_filename(filename: str) -> bool:
     if len(filename) > 255:
         raise SecurityValidationError("Filename is too long (max 255 characters)")
 
+    # Most filenames are safe, a single scan lets them skip the individual checks below,
+    # which are only needed to report what exactly is wrong with the filename.
+    if UNSAFE_FILENAME_PATTERN.search(filename) is None:
+        if filename[0] == "-":
+            raise SecurityValidationError("Filename cannot start with a dash")
+        return True
+
     # Prevent null bytes (can bypass security checks in some systems)
     if "\0" in filename:
         raise SecurityValidationError("Filename contains null bytes")
@@ -48,8 +79,7 @@ def validate_filename(filename: str) -> bool:
         raise SecurityValidationError("Filename cannot contain directory separators")
 
     # Block command injection characters
-    dangerous_chars = [";", "|", "&", "$", "`", "\n", "\r", "<", ">"]
-    for char in dangerous_chars:
+    for char in DANGEROUS_FILENAME_CHARS:
         if char in filename:
             raise SecurityValidationError(f"Filename contains dangerous character: '{char}'")
 
@@ -64,6 +94,21 @@ def validate_filename(filename: str) -> bool:
     return True
 
 
+@functools.lru_cache(maxsize=32)
+def resolve_base_dir(base_dir: str) -> Path:
+    """Resolve a trusted base directory to an absolute path.
+    Base directories are a few constant paths which don't move while the app is running,
+    so they are resolved once instead of on every call.
+
+    Arguments:
+        base_dir: The base directory (trusted)
+
+    Returns:
+        Resolved absolute path of the base directory
+    """
+    return Path(base_dir).resolve()
+
+
 def safe_path_join(base_dir: str, user_path: str) -> str:
     """Safely join a base directory with a user-provided path.
 
@@ -91,7 +136,7 @@ def safe_path_join(base_dir: str, user_path: str) -> str:
         raise SecurityValidationError("Path contains null bytes")
 
     # Resolve to absolute paths
-    base = Path(base_dir).resolve()
+    base = resolve_base_dir(base_dir)
 
     # Join and resolve the user path
     try:
@@ -123,13 +168,16 @@ def validate_path_exists(path: str, must_be_file: bool = True) -> bool:
     Raises:
         SecurityValidationError: If path doesn't exist or is wrong type
     """
-    if not os.path.exists(path):
+    # A single stat call answers both whether the path exists and what type it is.
+    try:
+        mode = os.stat(path).st_mode
+    except (OSError, ValueError):
         raise SecurityValidationError(f"Path does not exist: {path}")
 
-    if must_be_file and not os.path.isfile(path):
+    if must_be_file and not stat.S_ISREG(mode):
         raise SecurityValidationError(f"Path is not a file: {path}")
 
-    if not must_be_file and not os.path.isdir(path):
+    if not must_be_file and not stat.S_ISDIR(mode):
         raise SecurityValidationError(f"Path is not a directory: {path}")
 
     return True
@@ -148,9 +196,11 @@ def validate_file_extension(filename: str, allowed_extensions: list[str]) -> boo
     Raises:
         SecurityValidationError: If extension is not allowed
     """
-    _, ext = os.path.splitext(filename.lower())
+    # Only the extension is lowercased, not the whole filename.
+    ext = os.path.splitext(filename)[1].lower()
 
-    if ext not in [e.lower() for e in allowed_extensions]:
+    # The extension is lowercase, allowed extensions only need lowercasing if it isn't found as is.
+    if ext not in allowed_extensions and ext not in [e.lower() for e in allowed_extensions]:
         raise SecurityValidationError(
             f"File extension '{ext}' not allowed. "
             f"Allowed extensions: {', '.join(allowed_extensions)}"
@@ -174,52 +224,45 @@ def sanitize_dict_values(data: dict[str, Any], max_string_length: int = 10000) -
     Raises:
         SecurityValidationError: If suspicious patterns detected
     """
-    dangerous_patterns = [
-        r";\s*wget",
-        r";\s*curl",
-        r"\$\(",  # Command substitution
-        r"`",  # Backtick execution
-        r"\|\s*sh",
-        r"\|\s*bash",
-        r"eval\s*\(",
-        r"exec\s*\(",
-        r"__import__",
-        r"subprocess",
-        r"os\.system",
-    ]
-
-    pattern = re.compile("|".join(dangerous_patterns), re.IGNORECASE)
-
-    for key, value in data.items():
-        if isinstance(value, str):
-            # Check string length
-            if len(value) > max_string_length:
-                raise SecurityValidationError(
-                    f"Value for key '{key}' is too long " f"(max {max_string_length} characters)"
-                )
-
-            # Check for suspicious patterns
-            if pattern.search(value):
-                raise SecurityValidationError(
-                    f"Suspicious pattern detected in value for key '{key}'"
-                )
-
-        elif isinstance(value, dict):
-            # Recursively check nested dictionaries
-            sanitize_dict_values(value, max_string_length)
+    # Nested dictionaries are walked with an explicit stack of iterators instead of recursion,
+    # values are still checked in the same order.
+    stack = [iter(data.items())]
+    while stack:
+        for key, value in stack[-1]:
+            if isinstance(value, str):
+                # Check string length
+                if len(value) > max_string_length:
+                    raise SecurityValidationError(
+                        f"Value for key '{key}' is too long "
+                        f"(max {max_string_length} characters)"
+                    )
+
+                # Check for suspicious patterns
+                if DANGEROUS_VALUE_PATTERN.search(value):
+                    raise SecurityValidationError(
+                        f"Suspicious pattern detected in value for key '{key}'"
+                    )
+
+            elif isinstance(value, dict):
+                # Check the nested dictionary before the rest of the current one
+                stack.append(iter(value.items()))
+                break
+        else:
+            stack.pop()
 
     return data
 
 
 # Extension-based validation (more flexible than hardcoded filenames)
-ALLOWED_OSM_EXTENSIONS = {".osm", ".xml"}
-ALLOWED_DEM_EXTENSIONS = {".tif", ".tiff", ".png", ".dem"}
-ALLOWED_SCHEMA_EXTENSIONS = {".json"}
-ALLOWED_TEMPLATE_EXTENSIONS = {".xml", ".i3d"}
+# Extensions are lowercase, so they are matched directly without normalizing them on each call.
+ALLOWED_OSM_EXTENSIONS = frozenset({".osm", ".xml"})
+ALLOWED_DEM_EXTENSIONS = frozenset({".tif", ".tiff", ".png", ".dem"})
+ALLOWED_SCHEMA_EXTENSIONS = frozenset({".json"})
+ALLOWED_TEMPLATE_EXTENSIONS = frozenset({".xml", ".i3d"})
 
 
 def validate_file_type(
-    filename: str, allowed_extensions: set[str], file_type: str = "file"
+    filename: str, allowed_extensions: AbstractSet[str], file_type: str = "file"
 ) -> bool:
     """Validate that a filename has an allowed extension for its type.
 
@@ -234,12 +277,14 @@ def validate_file_type(
     Raises:
         SecurityValidationError: If extension not allowed
     """
-    _, ext = os.path.splitext(filename.lower())
+    # Only the extension is lowercased, not the whole filename.
+    ext = os.path.splitext(filename)[1].lower()
 
     if not ext:
         raise SecurityValidationError(f"{file_type} '{filename}' has no extension")
 
-    if ext not in {e.lower() for e in allowed_extensions}:
+    # The extension is lowercase, allowed extensions only need lowercasing if it isn't found as is.
+    if ext not in allowed_extensions and ext not in {e.lower() for e in allowed_extensions}:
         raise SecurityValidationError(
             f"{file_type} extension '{ext}' not allowed. "
             f"Allowed extensions: {', '.join(sorted(allowed_extensions))}"